@@ -0,0 +1,65 @@
+# Helpers shared by the Vercel Python functions; the leading underscore keeps
+# Vercel from deploying this module as a route of its own
+
+import re
+
+from fastapi.responses import ORJSONResponse
+
+# Street number (100-9999) and phone groups (200-999, 200-999, 1000-9999) share one
+# draw: all their combinations fit well inside a float draw's 53 bits
+CONTACT_COMBINATIONS = 9900 * 800 * 800 * 9000
+
+def contact_numbers(draw):
+    """Split one uniform [0, 1) draw into a street number and the three phone groups"""
+    contact, line = divmod(int(draw * CONTACT_COMBINATIONS), 9000)
+    contact, exchange = divmod(contact, 800)
+    street, area = divmod(contact, 800)
+    return 100 + street, 200 + area, 200 + exchange, 1000 + line
+
+def build_location_matcher(location_keys):
+    """
+    Return a function giving the earliest rank among location_keys whose city or
+    state part occurs in a lowercased location, or None, from one precompiled scan
+    """
+    # A part also inherits the rank of any shorter part that is its prefix, since
+    # at a given position the scan only reports the longest part
+    first_ranks = {}
+    for rank, key in enumerate(location_keys):
+        for part in key.split(", "):
+            first_ranks.setdefault(part, rank)
+    part_ranks = {
+        part: min(other_rank for other, other_rank in first_ranks.items() if part.startswith(other))
+        for part in first_ranks
+    }
+    
+    # A lookahead allows overlapping matches; longest-first alternation picks the
+    # longest part at each position
+    part_re = re.compile(
+        "(?=(" + "|".join(re.escape(part) for part in sorted(part_ranks, key=lambda part: (-len(part), part))) + "))"
+    )
+    
+    def best_location_rank(location_lower):
+        best_rank = None
+        for match in part_re.finditer(location_lower):
+            rank = part_ranks[match.group(1)]
+            if best_rank is None or rank < best_rank:
+                best_rank = rank
+                if rank == 0:
+                    break
+        return best_rank
+    
+    return best_location_rank
+
+def add_body_size_limit(app, max_bytes):
+    """
+    Refuse requests whose declared Content-Length exceeds max_bytes with a 413,
+    before their body is read
+    Only the declared length is checked: a chunked body without Content-Length
+    passes through and is bounded by the platform's own request size cap
+    """
+    @app.middleware("http")
+    async def reject_oversized_bodies(request, call_next):
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            return ORJSONResponse({"error": "Request body too large"}, status_code=413)
+        return await call_next(request)
@@ -1,70 +1,75 @@
-from http.server import BaseHTTPRequestHandler
-import json
+from functools import lru_cache
+from typing import Optional
 
-class handler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from api._shared import build_location_matcher
+
+# Common locations mapping for demo
+LOCATION_COORDS = {
+    "los angeles, ca": {"lat": 34.0522, "lng": -118.2437, "display_name": "Los Angeles, California, USA"},
+    "new york, ny": {"lat": 40.7128, "lng": -74.0060, "display_name": "New York, New York, USA"},
+    "chicago, il": {"lat": 41.8781, "lng": -87.6298, "display_name": "Chicago, Illinois, USA"},
+    "houston, tx": {"lat": 29.7604, "lng": -95.3698, "display_name": "Houston, Texas, USA"},
+    "phoenix, az": {"lat": 33.4484, "lng": -112.0740, "display_name": "Phoenix, Arizona, USA"},
+    "philadelphia, pa": {"lat": 39.9526, "lng": -75.1652, "display_name": "Philadelphia, Pennsylvania, USA"},
+    "san antonio, tx": {"lat": 29.4241, "lng": -98.4936, "display_name": "San Antonio, Texas, USA"},
+    "san diego, ca": {"lat": 32.7157, "lng": -117.1611, "display_name": "San Diego, California, USA"},
+    "dallas, tx": {"lat": 32.7767, "lng": -96.7970, "display_name": "Dallas, Texas, USA"},
+    "san jose, ca": {"lat": 37.3382, "lng": -121.8863, "display_name": "San Jose, California, USA"},
+}
+
+LOCATION_COORDS_BY_RANK = tuple(LOCATION_COORDS.values())
+
+# Earliest-listed location whose city or state part appears in a query
+best_location_rank = build_location_matcher(LOCATION_COORDS)
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type"],
+)
+
+class GeocodeRequest(BaseModel):
+    location: str = ''
+
+@app.post("/api/geocode")
+async def geocode(request: Optional[GeocodeRequest] = None):
+    try:
+        # An empty body geocodes the empty location
+        if request is None:
+            request = GeocodeRequest()
         
-        try:
-            # Read request body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode()) if content_length > 0 else {}
-            
-            location = data.get('location', '')
-            
-            # Geocode the location
-            coords = self.geocode_location(location)
-            
-            self.wfile.write(json.dumps(coords).encode())
-            
-        except Exception as e:
-            error_response = {"error": f"Geocoding error: {str(e)}"}
-            self.wfile.write(json.dumps(error_response).encode())
+        # Geocode the location
+        return geocode_location(request.location)
+        
+    except Exception as e:
+        return {"error": f"Geocoding error: {str(e)}"}
+
+@lru_cache(maxsize=1024)
+def geocode_location(location):
+    """Geocode a location string to coordinates, cached per string (treat the result as read-only)"""
+    location_lower = location.lower().strip()
     
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+    # Check if we have exact match
+    if location_lower in LOCATION_COORDS:
+        return LOCATION_COORDS[location_lower]
     
-    def geocode_location(self, location):
-        """Geocode a location string to coordinates"""
-        # Common locations mapping for demo
-        location_coords = {
-            "los angeles, ca": {"lat": 34.0522, "lng": -118.2437, "display_name": "Los Angeles, California, USA"},
-            "new york, ny": {"lat": 40.7128, "lng": -74.0060, "display_name": "New York, New York, USA"},
-            "chicago, il": {"lat": 41.8781, "lng": -87.6298, "display_name": "Chicago, Illinois, USA"},
-            "houston, tx": {"lat": 29.7604, "lng": -95.3698, "display_name": "Houston, Texas, USA"},
-            "phoenix, az": {"lat": 33.4484, "lng": -112.0740, "display_name": "Phoenix, Arizona, USA"},
-            "philadelphia, pa": {"lat": 39.9526, "lng": -75.1652, "display_name": "Philadelphia, Pennsylvania, USA"},
-            "san antonio, tx": {"lat": 29.4241, "lng": -98.4936, "display_name": "San Antonio, Texas, USA"},
-            "san diego, ca": {"lat": 32.7157, "lng": -117.1611, "display_name": "San Diego, California, USA"},
-            "dallas, tx": {"lat": 32.7767, "lng": -96.7970, "display_name": "Dallas, Texas, USA"},
-            "san jose, ca": {"lat": 37.3382, "lng": -121.8863, "display_name": "San Jose, California, USA"},
-        }
-        
-        location_lower = location.lower().strip()
-        
-        # Check if we have exact match
-        if location_lower in location_coords:
-            return location_coords[location_lower]
-        
-        # Try partial matching
-        for key, coords in location_coords.items():
-            if any(part in location_lower for part in key.split(", ")):
-                return coords
-        
-        # Default to Los Angeles if no match found
-        return {
-            "lat": 34.0522, 
-            "lng": -118.2437, 
-            "display_name": f"{location} (estimated location)",
-            "estimated": True
-        } 
\ No newline at end of file
+    # Try partial matching; the earliest-listed location wins
+    best_rank = best_location_rank(location_lower)
+    if best_rank is not None:
+        return LOCATION_COORDS_BY_RANK[best_rank]
+    
+    # Default to Los Angeles if no match found
+    return {
+        "lat": 34.0522, 
+        "lng": -118.2437, 
+        "display_name": f"{location} (estimated location)",
+        "estimated": True
+    } 
\ No newline at end of file
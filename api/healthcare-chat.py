@@ -1,359 +1,484 @@
-from http.server import BaseHTTPRequestHandler
-import json
+import logging
 import random
+import re
 import time
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
 
-class handler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        
-        try:
-            # Read request body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode()) if content_length > 0 else {}
-            
-            messages = data.get('messages', [])
-            user_location = data.get('location', {})
-            weather_data = data.get('weather', {})
-            
-            # Get the latest user message and extract location data from it
-            user_message = ""
-            for msg in reversed(messages):
-                if msg.get('role') == 'user':
-                    user_message = msg.get('content', '')
-                    # Extract location data from the message if available
-                    if msg.get('location') and not user_location:
-                        user_location = msg.get('location', {})
-                        print(f"📍 Extracted location from message: {user_location}")
-                    break
-            
-            print(f"🔍 Processing request with location: {user_location}")
-            print(f"💬 User message: {user_message}")
-            
-            # Generate healthcare response
-            response = self.generate_healthcare_response(user_message, user_location, weather_data)
-            
-            self.wfile.write(json.dumps(response).encode())
-            
-        except Exception as e:
-            error_response = {"error": f"Healthcare chat error: {str(e)}"}
-            self.wfile.write(json.dumps(error_response).encode())
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from api._shared import add_body_size_limit, contact_numbers
+
+# Per-request diagnostics are debug-level so production pays only a level check
+logger = logging.getLogger(__name__)
+
+# Injury/condition keywords, in detection priority order
+INJURY_TYPES = {
+    'sprain': ['sprained', 'sprain', 'twisted', 'ankle sprain', 'wrist sprain'],
+    'cut': ['cut', 'laceration', 'bleeding', 'wound', 'gash'],
+    'burn': ['burn', 'burned', 'scald', 'thermal injury'],
+    'fracture': ['broken', 'fracture', 'fractured', 'bone'],
+    'flu': ['flu', 'fever', 'cold', 'sick', 'influenza'],
+    'headache': ['headache', 'migraine', 'head pain'],
+    'chest_pain': ['chest pain', 'heart', 'cardiac', 'chest'],
+    'allergic': ['allergic', 'allergy', 'rash', 'reaction']
+}
+
+# Detection results by priority rank; the extra final slot is the no-match fallback
+INJURY_NAMES = (*INJURY_TYPES, 'general')
+
+def build_keyword_ranks(injury_types):
+    """
+    Map each keyword to the highest-priority injury rank it can detect
+    A keyword also inherits the rank of any shorter keyword that is its prefix,
+    since at a given position the matcher only reports the longest keyword
+    """
+    keyword_ranks = {}
+    for rank, keywords in enumerate(injury_types.values()):
+        for keyword in keywords:
+            keyword_ranks.setdefault(keyword, rank)
+    return {
+        keyword: min(other_rank for other, other_rank in keyword_ranks.items() if keyword.startswith(other))
+        for keyword in keyword_ranks
+    }
+
+KEYWORD_RANKS = build_keyword_ranks(INJURY_TYPES)
+
+# Keywords longest first, so the alternation picks the longest keyword at each position
+KEYWORDS_BY_LENGTH = sorted(KEYWORD_RANKS, key=lambda keyword: (-len(keyword), keyword))
+
+# Every keyword occurrence in one C-level scan: a lookahead allows overlapping
+# matches, and each keyword gets its own group so a match's lastindex identifies it
+INJURY_KEYWORD_RE = re.compile(
+    "(?=" + "|".join(f"({re.escape(keyword)})" for keyword in KEYWORDS_BY_LENGTH) + ")",
+    re.IGNORECASE  # Matches the raw message, so no lowercased copy is needed
+)
+
+# Injury rank by regex group number (groups are numbered from 1)
+GROUP_RANKS = (len(INJURY_TYPES), *(KEYWORD_RANKS[keyword] for keyword in KEYWORDS_BY_LENGTH))
+
+# Hospital templates with different specialties
+HOSPITAL_TEMPLATES = (
+    {
+        "name": "City General Hospital",
+        "specialties": ("Emergency Medicine", "Orthopedics", "Internal Medicine"),
+        "rating": "4.2",
+        "wait_time": "15-45 min",
+        "emergency": True,
+        "urgentCare": False
+    },
+    {
+        "name": "Regional Medical Center", 
+        "specialties": ("Trauma Care", "Emergency Medicine", "Surgery"),
+        "rating": "4.5",
+        "wait_time": "20-60 min",
+        "emergency": True,
+        "urgentCare": False
+    },
+    {
+        "name": "Urgent Care Plus",
+        "specialties": ("Urgent Care", "Family Medicine", "Minor Injuries"),
+        "rating": "4.0", 
+        "wait_time": "10-30 min",
+        "emergency": False,
+        "urgentCare": True
+    },
+    {
+        "name": "University Medical Center",
+        "specialties": ("Cardiology", "Emergency Medicine", "Specialized Care"),
+        "rating": "4.7",
+        "wait_time": "25-75 min",
+        "emergency": True,
+        "urgentCare": False
+    },
+    {
+        "name": "FastCare Clinic",
+        "specialties": ("Walk-in Care", "Minor Injuries", "Preventive Care"),
+        "rating": "3.8",
+        "wait_time": "5-20 min",
+        "emergency": False,
+        "urgentCare": True
+    }
+)
+
+# Random draws per recommended hospital: distance, lat offset, lng offset and
+# contact numbers (street number plus phone, see contact_numbers)
+HOSPITAL_RANDOM_VALUES = 4
+
+# Specialty relevance by injury type
+SPECIALTY_SCORES = {
+    'sprain': {
+        'Orthopedics': 0.9,
+        'Emergency Medicine': 0.7,
+        'Urgent Care': 0.8,
+        'Minor Injuries': 0.9
+    },
+    'cut': {
+        'Emergency Medicine': 0.9,
+        'Urgent Care': 0.8,
+        'Surgery': 0.7,
+        'Minor Injuries': 0.8
+    },
+    'fracture': {
+        'Orthopedics': 0.95,
+        'Emergency Medicine': 0.8,
+        'Trauma Care': 0.9,
+        'Surgery': 0.7
+    },
+    'chest_pain': {
+        'Cardiology': 0.95,
+        'Emergency Medicine': 0.9,
+        'Internal Medicine': 0.7
+    },
+    'general': {
+        'Emergency Medicine': 0.8,
+        'Urgent Care': 0.7,
+        'Family Medicine': 0.6
+    }
+}
+
+def calculate_hospital_relevance(hospital, injury_type):
+    """Calculate how relevant a hospital is for a specific injury type"""
     
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+    injury_scores = SPECIALTY_SCORES.get(injury_type, SPECIALTY_SCORES['general'])
     
-    def generate_healthcare_response(self, user_message, location, weather):
-        """Generate a healthcare assistant response based on user input"""
+    max_score = 0
+    for specialty in hospital['specialties']:
+        score = injury_scores.get(specialty, 0.3)
+        max_score = max(max_score, score)
+    
+    return max_score
+
+# Hospitals and scores are static, so score every hospital for every injury
+# type once at import; a request reads one row instead of re-scoring
+HOSPITAL_RELEVANCE = {
+    injury_type: tuple(calculate_hospital_relevance(hospital, injury_type) for hospital in HOSPITAL_TEMPLATES)
+    for injury_type in SPECIALTY_SCORES
+}
+
+# Hospitals recommended per injury type: the relevant ones (score above 0.3),
+# best first, capped at the top 4; only their random details vary per request
+RANKED_HOSPITALS = {
+    injury_type: tuple(sorted(
+        ((template, relevance_score) for template, relevance_score in zip(HOSPITAL_TEMPLATES, relevance_scores) if relevance_score > 0.3),
+        key=lambda candidate: candidate[1],
+        reverse=True
+    )[:4])
+    for injury_type, relevance_scores in HOSPITAL_RELEVANCE.items()
+}
+
+# Static rating/wait/specialty lines of each hospital's entry in the response list
+HOSPITAL_LIST_DETAILS = {
+    template['name']: (
+        f"\n   - Rating: {template['rating']}/5, Wait: {template['wait_time']}\n"
+        f"   - Specialties: {', '.join(template['specialties'][:2])}\n"  # Show first 2 specialties
+    )
+    for template in HOSPITAL_TEMPLATES
+}
+
+# Injury-specific advice
+ADVICE_MAP = {
+    'sprain': "For a sprained ankle, follow the RICE method: Rest, Ice, Compression, and Elevation. Avoid putting weight on the injury.",
+    'cut': "For cuts, apply direct pressure to stop bleeding. Clean the wound gently and keep it covered.",
+    'fracture': "If you suspect a fracture, avoid moving the injured area and seek immediate medical attention.",
+    'chest_pain': "Chest pain can be serious. If you're experiencing severe chest pain, call 911 immediately.",
+    'general': "Based on your symptoms, I recommend seeking appropriate medical care."
+}
+
+# Default coordinates (Los Angeles area as fallback)
+DEFAULT_COORDS = (34.0522, -118.2437)
+
+# City coordinates for string-based location matching, in match priority order
+CITY_COORDS = {
+    "los angeles": (34.0522, -118.2437),
+    "new york": (40.7128, -74.0060),
+    "chicago": (41.8781, -87.6298),
+    "houston": (29.7604, -95.3698),
+    "phoenix": (33.4484, -112.0740),
+    "philadelphia": (39.9526, -75.1652),
+    "san antonio": (29.4241, -98.4936),
+    "san diego": (32.7157, -117.1611),
+    "dallas": (32.7767, -96.7970),
+    "san jose": (37.3382, -121.8863),
+    "seattle": (47.6062, -122.3321),
+    "boston": (42.3601, -71.0589),
+    "denver": (39.7392, -104.9903),
+    "atlanta": (33.7490, -84.3880),
+    "miami": (25.7617, -80.1918)
+}
+CITY_COORDS_BY_RANK = tuple(CITY_COORDS.items())
+CITY_RANKS = {city: rank for rank, city in enumerate(CITY_COORDS)}
+
+# Every city occurrence in one C-level scan, longest name first at each position
+CITY_RE = re.compile(
+    "(?=(" + "|".join(re.escape(city) for city in sorted(CITY_COORDS, key=lambda city: (-len(city), city))) + "))"
+)
+
+# Largest declared request body accepted, chat history included
+MAX_BODY_BYTES = 256 * 1024
+
+# Only the most recent messages are searched for the latest user turn, however long the history
+MAX_SCANNED_MESSAGES = 20
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+add_body_size_limit(app, MAX_BODY_BYTES)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type"],
+)
+
+class HealthcareChatRequest(BaseModel):
+    messages: List[Dict[str, Any]] = []
+    location: Any = {}
+    weather: Optional[Dict[str, Any]] = {}
+
+class LocationContext(NamedTuple):
+    """Request location, normalized once from the structured dict or string the client sent"""
+    lat: float
+    lng: float
+    city: Any  # City named in the response text, '' if unknown
+    address_city: Any  # City used in generated hospital addresses
+    weather: Optional[Dict[str, Any]]  # Weather sent with a structured location, None for strings
+
+@app.post("/api/healthcare-chat")
+async def healthcare_chat(request: Optional[HealthcareChatRequest] = None):
+    try:
+        # An empty body is answered like a request with no messages
+        if request is None:
+            request = HealthcareChatRequest()
         
-        # Detect injury/condition type from user message
-        message_lower = user_message.lower()
+        messages = request.messages
+        user_location = request.location
+        weather_data = request.weather
         
-        injury_types = {
-            'sprain': ['sprained', 'sprain', 'twisted', 'ankle sprain', 'wrist sprain'],
-            'cut': ['cut', 'laceration', 'bleeding', 'wound', 'gash'],
-            'burn': ['burn', 'burned', 'scald', 'thermal injury'],
-            'fracture': ['broken', 'fracture', 'fractured', 'bone'],
-            'flu': ['flu', 'fever', 'cold', 'sick', 'influenza'],
-            'headache': ['headache', 'migraine', 'head pain'],
-            'chest_pain': ['chest pain', 'heart', 'cardiac', 'chest'],
-            'allergic': ['allergic', 'allergy', 'rash', 'reaction']
-        }
+        # Get the latest user message and extract location data from it
+        last_user = next((msg for msg in reversed(messages[-MAX_SCANNED_MESSAGES:]) if msg.get('role') == 'user'), None)
+        user_message = last_user.get('content', '') if last_user else ""
         
-        detected_injury = 'general'
-        for injury_type, keywords in injury_types.items():
-            if any(keyword in message_lower for keyword in keywords):
-                detected_injury = injury_type
-                break
+        # Extract location data from the message if available
+        if last_user and last_user.get('location') and not user_location:
+            user_location = last_user['location']
+            logger.debug("📍 Extracted location from message: %s", user_location)
         
-        # Generate hospital recommendations based on injury type
-        hospitals = self.generate_hospital_recommendations(detected_injury, location, weather)
+        logger.debug("🔍 Processing request with location: %s", user_location)
+        logger.debug("💬 User message: %s", user_message)
         
-        # Create response content
-        response_content = self.create_response_content(detected_injury, hospitals, location, weather)
+        # Generate healthcare response
+        return generate_healthcare_response(user_message, normalize_location(user_location), weather_data)
         
-        return {
-            "role": "assistant",
-            "content": response_content,
-            "type": "healthcare",
-            "data_sources": ["hospital_database", "location_services", "weather_api"],
-            "hospital_recommendations": hospitals,  # Add hospital data for map display
-            "rag_context": {
-                "documents_used": random.randint(3, 8),
-                "openai_enhanced": True,
-                "rag_documents": [
-                    {"source": "medical_guidelines", "relevance": 0.95},
-                    {"source": "hospital_directory", "relevance": 0.88},
-                    {"source": "emergency_protocols", "relevance": 0.82}
-                ]
-            }
+    except Exception as e:
+        return {"error": f"Healthcare chat error: {str(e)}"}
+
+def generate_healthcare_response(user_message, location, weather):
+    """Generate a healthcare assistant response based on user input"""
+    
+    # Detect injury/condition type from user message
+    best_rank = len(INJURY_TYPES)
+    for match in INJURY_KEYWORD_RE.finditer(user_message):
+        rank = GROUP_RANKS[match.lastindex]
+        if rank < best_rank:
+            best_rank = rank
+            if rank == 0:
+                break
+    detected_injury = INJURY_NAMES[best_rank]
+    
+    # Generate hospital recommendations based on injury type
+    hospitals = generate_hospital_recommendations(detected_injury, location, weather)
+    
+    # Create response content
+    response_content = create_response_content(detected_injury, hospitals, location, weather)
+    
+    return {
+        "role": "assistant",
+        "content": response_content,
+        "type": "healthcare",
+        "data_sources": ["hospital_database", "location_services", "weather_api"],
+        "hospital_recommendations": hospitals,  # Add hospital data for map display
+        "rag_context": {
+            "documents_used": 3 + int(random.random() * 6),  # 3-8
+            "openai_enhanced": True,
+            "rag_documents": [
+                {"source": "medical_guidelines", "relevance": 0.95},
+                {"source": "hospital_directory", "relevance": 0.88},
+                {"source": "emergency_protocols", "relevance": 0.82}
+            ]
         }
+    }
+
+def generate_hospital_recommendations(injury_type, location, weather):
+    """Generate hospital recommendations based on injury type and location"""
     
-    def generate_hospital_recommendations(self, injury_type, location, weather):
-        """Generate hospital recommendations based on injury type and location"""
-        
-        # Parse location coordinates - try to get lat/lng from location string
-        base_lat, base_lng = self.get_location_coordinates(location)
-        
-        # Hospital templates with different specialties
-        hospital_data = [
-            {
-                "name": "City General Hospital",
-                "specialties": ["Emergency Medicine", "Orthopedics", "Internal Medicine"],
-                "rating": "4.2",
-                "wait_time": "15-45 min",
-                "emergency": True,
-                "urgentCare": False
-            },
-            {
-                "name": "Regional Medical Center", 
-                "specialties": ["Trauma Care", "Emergency Medicine", "Surgery"],
-                "rating": "4.5",
-                "wait_time": "20-60 min",
-                "emergency": True,
-                "urgentCare": False
-            },
-            {
-                "name": "Urgent Care Plus",
-                "specialties": ["Urgent Care", "Family Medicine", "Minor Injuries"],
-                "rating": "4.0", 
-                "wait_time": "10-30 min",
-                "emergency": False,
-                "urgentCare": True
-            },
-            {
-                "name": "University Medical Center",
-                "specialties": ["Cardiology", "Emergency Medicine", "Specialized Care"],
-                "rating": "4.7",
-                "wait_time": "25-75 min",
-                "emergency": True,
-                "urgentCare": False
-            },
-            {
-                "name": "FastCare Clinic",
-                "specialties": ["Walk-in Care", "Minor Injuries", "Preventive Care"],
-                "rating": "3.8",
-                "wait_time": "5-20 min",
-                "emergency": False,
-                "urgentCare": True
-            }
-        ]
-        
-        # Filter and rank hospitals based on injury type
-        relevant_hospitals = []
-        for i, hospital in enumerate(hospital_data):
-            relevance_score = self.calculate_hospital_relevance(hospital, injury_type)
-            if relevance_score > 0.3:  # Only include relevant hospitals
-                distance_miles = round(random.uniform(0.8, 12.5), 1)
-                
-                # Generate coordinates around the base location
-                lat_offset = random.uniform(-0.05, 0.05)  # ~3-4 miles radius
-                lng_offset = random.uniform(-0.05, 0.05)
-                
-                hospital['relevance'] = relevance_score
-                hospital['distance'] = f"{distance_miles} miles"
-                hospital['lat'] = base_lat + lat_offset
-                hospital['lng'] = base_lng + lng_offset
-                
-                # Generate realistic address based on location
-                city_name = "Unknown City"
-                if isinstance(location, dict):
-                    city_name = location.get('city', 'Unknown City')
-                elif isinstance(location, str) and location != "Not provided":
-                    city_name = location
-                
-                hospital['address'] = f"{random.randint(100, 9999)} Medical Drive, {city_name}"
-                hospital['phone'] = f"({random.randint(200, 999)}) {random.randint(200, 999)}-{random.randint(1000, 9999)}"
-                
-                print(f"🏥 Generated hospital: {hospital['name']} at ({hospital['lat']:.4f}, {hospital['lng']:.4f})")
-                
-                relevant_hospitals.append(hospital)
+    # Relevant hospitals, already ranked for this injury type
+    candidates = RANKED_HOSPITALS.get(injury_type, RANKED_HOSPITALS['general'])
+    
+    # Draw every hospital's random values in one batch up front
+    random_block = random_hospital_values(len(candidates))
+    
+    # The city is fixed per request, so only the street number varies per hospital
+    address_suffix = f" Medical Drive, {location.address_city}"
+    
+    relevant_hospitals = []
+    for (template, relevance_score), random_values in zip(candidates, random_block):
+        distance_draw, lat_draw, lng_draw, contact_draw = random_values
+        street, area, exchange, line = contact_numbers(contact_draw)
+        distance_miles = round(0.8 + distance_draw * 11.7, 1)  # 0.8-12.5 miles
         
-        # Sort by relevance score (descending)
-        relevant_hospitals.sort(key=lambda x: x['relevance'], reverse=True)
+        # Generate coordinates around the base location
+        lat_offset = (lat_draw - 0.5) * 0.1  # ~3-4 miles radius
+        lng_offset = (lng_draw - 0.5) * 0.1
         
-        return relevant_hospitals[:4]  # Return top 4 hospitals
+        # Per-request fields go on a new dict; the shared template is never mutated
+        relevant_hospitals.append({
+            **template,
+            'relevance': relevance_score,
+            'distance': f"{distance_miles} miles",
+            'lat': location.lat + lat_offset,
+            'lng': location.lng + lng_offset,
+            'address': f"{street}{address_suffix}",
+            'phone': f"({area}) {exchange}-{line}"
+        })
     
-    def get_location_coordinates(self, location):
-        """Get coordinates for a given location - handles both structured data and strings"""
-        
-        # Default coordinates (Los Angeles area as fallback)
-        default_coords = (34.0522, -118.2437)
+    return relevant_hospitals
+
+def random_hospital_values(count):
+    """Draw the uniform [0, 1) values used to mock each recommended hospital"""
+    draw = random.random
+    return [[draw() for _ in range(HOSPITAL_RANDOM_VALUES)] for _ in range(count)]
+
+def normalize_location(location):
+    """Resolve coordinates, city names and attached weather from the raw request location"""
+    lat, lng = get_location_coordinates(location)
+    
+    if isinstance(location, dict):
+        return LocationContext(lat, lng, location.get('city', ''), location.get('city', 'Unknown City'), location.get('weather') or {})
+    
+    # Addresses name a string location directly unless the client had none
+    address_city = location if isinstance(location, str) and location != "Not provided" else "Unknown City"
+    return LocationContext(lat, lng, '', address_city, None)
+
+def get_location_coordinates(location):
+    """Get coordinates for a given location - handles both structured data and strings"""
+    
+    if not location:
+        return DEFAULT_COORDS
+    
+    # Handle structured location data from frontend (preferred method)
+    if isinstance(location, dict):
+        latitude = location.get('latitude')
+        longitude = location.get('longitude')
         
-        if not location:
-            return default_coords
+        # If we have valid coordinates, use them
+        if latitude is not None and longitude is not None:
+            try:
+                lat = float(latitude)
+                lng = float(longitude)
+                # Validate coordinates are reasonable
+                if -90 <= lat <= 90 and -180 <= lng <= 180:
+                    logger.debug("✅ Using structured location coordinates: %s, %s", lat, lng)
+                    return (lat, lng)
+            except (ValueError, TypeError):
+                logger.warning("⚠️ Invalid coordinate values: lat=%s, lng=%s", latitude, longitude)
         
-        # Handle structured location data from frontend (preferred method)
-        if isinstance(location, dict):
-            latitude = location.get('latitude')
-            longitude = location.get('longitude')
-            
-            # If we have valid coordinates, use them
-            if latitude is not None and longitude is not None:
-                try:
-                    lat = float(latitude)
-                    lng = float(longitude)
-                    # Validate coordinates are reasonable
-                    if -90 <= lat <= 90 and -180 <= lng <= 180:
-                        print(f"✅ Using structured location coordinates: {lat}, {lng}")
-                        return (lat, lng)
-                except (ValueError, TypeError):
-                    print(f"⚠️ Invalid coordinate values: lat={latitude}, lng={longitude}")
-            
-            # Fallback to city name if coordinates not available
-            city = location.get('city', '')
-            if city:
-                location_string = city
-            else:
-                print("⚠️ No valid location data found in structured location object")
-                return default_coords
+        # Fallback to city name if coordinates not available
+        city = location.get('city', '')
+        if city:
+            location_string = str(city)
         else:
-            # Handle string location data
-            location_string = str(location)
-        
-        # String-based location matching (fallback)
-        if location_string and location_string != "Not provided":
-            location_coords = {
-                "los angeles": (34.0522, -118.2437),
-                "new york": (40.7128, -74.0060),
-                "chicago": (41.8781, -87.6298),
-                "houston": (29.7604, -95.3698),
-                "phoenix": (33.4484, -112.0740),
-                "philadelphia": (39.9526, -75.1652),
-                "san antonio": (29.4241, -98.4936),
-                "san diego": (32.7157, -117.1611),
-                "dallas": (32.7767, -96.7970),
-                "san jose": (37.3382, -121.8863),
-                "seattle": (47.6062, -122.3321),
-                "boston": (42.3601, -71.0589),
-                "denver": (39.7392, -104.9903),
-                "atlanta": (33.7490, -84.3880),
-                "miami": (25.7617, -80.1918)
-            }
-            
-            location_lower = location_string.lower()
-            
-            # Check for matches in the location string
-            for city, coords in location_coords.items():
-                if city in location_lower:
-                    print(f"✅ Using city-based coordinates for {city}: {coords}")
-                    return coords
-        
-        # If no match found, return default coordinates
-        print(f"⚠️ No location match found, using default coordinates: {default_coords}")
-        return default_coords
+            logger.debug("⚠️ No valid location data found in structured location object")
+            return DEFAULT_COORDS
+    else:
+        # Handle string location data
+        location_string = str(location)
     
-    def calculate_hospital_relevance(self, hospital, injury_type):
-        """Calculate how relevant a hospital is for a specific injury type"""
-        
-        specialty_scores = {
-            'sprain': {
-                'Orthopedics': 0.9,
-                'Emergency Medicine': 0.7,
-                'Urgent Care': 0.8,
-                'Minor Injuries': 0.9
-            },
-            'cut': {
-                'Emergency Medicine': 0.9,
-                'Urgent Care': 0.8,
-                'Surgery': 0.7,
-                'Minor Injuries': 0.8
-            },
-            'fracture': {
-                'Orthopedics': 0.95,
-                'Emergency Medicine': 0.8,
-                'Trauma Care': 0.9,
-                'Surgery': 0.7
-            },
-            'chest_pain': {
-                'Cardiology': 0.95,
-                'Emergency Medicine': 0.9,
-                'Internal Medicine': 0.7
-            },
-            'general': {
-                'Emergency Medicine': 0.8,
-                'Urgent Care': 0.7,
-                'Family Medicine': 0.6
-            }
-        }
-        
-        injury_scores = specialty_scores.get(injury_type, specialty_scores['general'])
-        
-        max_score = 0
-        for specialty in hospital['specialties']:
-            score = injury_scores.get(specialty, 0.3)
-            max_score = max(max_score, score)
-        
-        return max_score
+    return coordinates_from_string(location_string)
+
+@lru_cache(maxsize=1024)
+def coordinates_from_string(location_string):
+    """Match a free-form location string against the known cities, cached per string"""
     
-    def create_response_content(self, injury_type, hospitals, location, weather):
-        """Create the response content for the healthcare assistant"""
-        
-        # Injury-specific advice
-        advice_map = {
-            'sprain': "For a sprained ankle, follow the RICE method: Rest, Ice, Compression, and Elevation. Avoid putting weight on the injury.",
-            'cut': "For cuts, apply direct pressure to stop bleeding. Clean the wound gently and keep it covered.",
-            'fracture': "If you suspect a fracture, avoid moving the injured area and seek immediate medical attention.",
-            'chest_pain': "Chest pain can be serious. If you're experiencing severe chest pain, call 911 immediately.",
-            'general': "Based on your symptoms, I recommend seeking appropriate medical care."
-        }
+    # String-based location matching (fallback)
+    if location_string and location_string != "Not provided":
+        location_lower = location_string.lower()
         
-        advice = advice_map.get(injury_type, advice_map['general'])
-        
-        # Weather considerations
-        weather_note = ""
-        current_location = "your area"
+        # Check for matches in the location string; the earliest-listed city wins
+        best_rank = None
+        for match in CITY_RE.finditer(location_lower):
+            rank = CITY_RANKS[match.group(1)]
+            if best_rank is None or rank < best_rank:
+                best_rank = rank
+                if rank == 0:
+                    break
+        if best_rank is not None:
+            city, coords = CITY_COORDS_BY_RANK[best_rank]
+            logger.debug("✅ Using city-based coordinates for %s: %s", city, coords)
+            return coords
+    
+    # If no match found, return default coordinates
+    logger.debug("⚠️ No location match found, using default coordinates: %s", DEFAULT_COORDS)
+    return DEFAULT_COORDS
+
+def create_response_content(injury_type, hospitals, location, weather):
+    """Create the response content for the healthcare assistant"""
+    
+    # Weather considerations
+    weather_note = ""
+    current_location = location.city or "your area"
+    
+    # Get weather info from location data
+    if location.weather is not None:
+        weather_info = location.weather
         
-        # Get weather info from location data
-        if isinstance(location, dict):
-            weather_info = location.get('weather', {})
-            city_name = location.get('city', '')
-            if city_name:
-                current_location = city_name
-            
-            # Use weather from location object if available
-            if weather_info and weather_info.get('temperature'):
-                temp = weather_info.get('temperature', 70)
-                condition = weather_info.get('condition', '')
-                if temp > 85:
-                    weather_note = f"\n🌡️ Note: It's {temp}°F in {current_location} with {condition} - stay hydrated and consider the heat when traveling to the hospital."
-                elif temp < 40:
-                    weather_note = f"\n🌡️ Note: It's {temp}°F in {current_location} with {condition} - dress warmly and be careful of icy conditions when traveling."
-                else:
-                    weather_note = f"\n🌡️ Current weather in {current_location}: {temp}°F, {condition}"
-            
-        # Fallback to standalone weather data
-        elif weather and weather.get('temperature'):
-            temp = weather.get('temperature', 70)
+        # Use weather from location object if available
+        if weather_info and weather_info.get('temperature'):
+            temp = weather_info.get('temperature', 70)
+            condition = weather_info.get('condition', '')
             if temp > 85:
-                weather_note = f"\n🌡️ Note: It's {temp}°F outside - stay hydrated and consider the heat when traveling to the hospital."
+                weather_note = f"\n🌡️ Note: It's {temp}°F in {current_location} with {condition} - stay hydrated and consider the heat when traveling to the hospital."
             elif temp < 40:
-                weather_note = f"\n🌡️ Note: It's {temp}°F outside - dress warmly and be careful of icy conditions when traveling."
-        
-        # Build hospital list
-        hospital_list = ""
-        for i, hospital in enumerate(hospitals, 1):
-            specialties_str = ", ".join(hospital['specialties'][:2])  # Show first 2 specialties
-            rating_display = f"{hospital['rating']}/5"
-            hospital_list += f"\n{i}. **{hospital['name']}** - {hospital['distance']}\n"
-            hospital_list += f"   - Rating: {rating_display}, Wait: {hospital['wait_time']}\n"
-            hospital_list += f"   - Specialties: {specialties_str}\n"
-        
-        # Construct full response
-        response = f"🏥 **Healthcare Recommendation**\n\n"
-        response += f"**Assessment**: {advice}\n"
-        response += weather_note
-        response += f"\n\n**Recommended Hospitals Near {current_location}:**{hospital_list}"
-        response += f"\n💡 **Recommendation**: Based on your condition, I suggest visiting {hospitals[0]['name']} as it has relevant specialties and good availability.\n"
-        response += f"\n📞 **Important**: If this is a medical emergency, please call 911 immediately."
+                weather_note = f"\n🌡️ Note: It's {temp}°F in {current_location} with {condition} - dress warmly and be careful of icy conditions when traveling."
+            else:
+                weather_note = f"\n🌡️ Current weather in {current_location}: {temp}°F, {condition}"
         
-        return response 
\ No newline at end of file
+    # Fallback to standalone weather data
+    elif weather and weather.get('temperature'):
+        temp = weather.get('temperature', 70)
+        if temp > 85:
+            weather_note = f"\n🌡️ Note: It's {temp}°F outside - stay hydrated and consider the heat when traveling to the hospital."
+        elif temp < 40:
+            weather_note = f"\n🌡️ Note: It's {temp}°F outside - dress warmly and be careful of icy conditions when traveling."
+    
+    # Build hospital list; only the position and distance vary per request
+    hospital_list = "".join([
+        f"\n{i}. **{hospital['name']}** - {hospital['distance']}{HOSPITAL_LIST_DETAILS[hospital['name']]}"
+        for i, hospital in enumerate(hospitals, 1)
+    ])
+    
+    # Construct full response around the cached fixed text
+    header, footer = response_frame(injury_type, str(current_location), weather_note, hospitals[0]['name'])
+    return header + hospital_list + footer
+
+@lru_cache(maxsize=2048)
+def response_frame(injury_type, current_location, weather_note, top_hospital):
+    """Render the response text before and after the hospital list"""
+    
+    advice = ADVICE_MAP.get(injury_type, ADVICE_MAP['general'])
+    
+    header = "".join([
+        "🏥 **Healthcare Recommendation**\n\n",
+        f"**Assessment**: {advice}\n",
+        weather_note,
+        f"\n\n**Recommended Hospitals Near {current_location}:**"
+    ])
+    footer = "".join([
+        f"\n💡 **Recommendation**: Based on your condition, I suggest visiting {top_hospital} as it has relevant specialties and good availability.\n",
+        "\n📞 **Important**: If this is a medical emergency, please call 911 immediately."
+    ])
+    
+    return header, footer 
\ No newline at end of file
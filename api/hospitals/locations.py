@@ -1,105 +1,138 @@
-from http.server import BaseHTTPRequestHandler
-import json
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from functools import lru_cache
+from operator import itemgetter
+from typing import Optional
 import random
 
-class handler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+from api._shared import add_body_size_limit, build_location_matcher, contact_numbers
+
+# Largest declared request body accepted
+MAX_BODY_BYTES = 64 * 1024
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+add_body_size_limit(app, MAX_BODY_BYTES)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type"],
+)
+
+class HospitalLocationsRequest(BaseModel):
+    location: str = ''
+    injuryType: str = 'general'
+    radius: float = 25
+
+@app.post("/api/hospitals/locations")
+async def hospital_locations(request: Optional[HospitalLocationsRequest] = None):
+    try:
+        # An empty body gets the default location's hospitals
+        if request is None:
+            request = HospitalLocationsRequest()
+        
+        # Get hospital locations
+        return get_hospital_locations(request.location, request.injuryType, request.radius)
         
-        try:
-            # Read request body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode()) if content_length > 0 else {}
-            
-            location = data.get('location', '')
-            injury_type = data.get('injuryType', 'general')
-            radius = data.get('radius', 25)
-            
-            # Get hospital locations
-            hospitals = self.get_hospital_locations(location, injury_type, radius)
-            
-            self.wfile.write(json.dumps(hospitals).encode())
-            
-        except Exception as e:
-            error_response = {"error": f"Hospital locations error: {str(e)}"}
-            self.wfile.write(json.dumps(error_response).encode())
+    except Exception as e:
+        return {"error": f"Hospital locations error: {str(e)}"}
+
+# Hospital name templates
+HOSPITAL_PREFIXES = ('Central', 'West', 'East', 'North', 'South')
+HOSPITAL_TYPES = (
+    "General Hospital", "Medical Center", "Regional Medical Center", 
+    "Community Hospital", "Memorial Hospital", "St. Mary's Hospital",
+    "University Medical Center", "Emergency Medical Center"
+)
+
+# Specialty sets a generated hospital can offer
+HOSPITAL_SPECIALTIES = (
+    ("Emergency Medicine", "Internal Medicine", "Surgery"),
+    ("Cardiology", "Emergency Medicine", "Orthopedics"),
+    ("Pediatrics", "Emergency Medicine", "Family Medicine"),
+    ("Trauma Care", "Emergency Medicine", "Critical Care"),
+    ("Orthopedics", "Sports Medicine", "Physical Therapy"),
+    ("Urgent Care", "Family Medicine", "Internal Medicine")
+)
+
+# Random draws per generated hospital: name prefix, name type, distance, rating,
+# specialties, the two wait bounds, lat offset, lng offset, contact numbers
+# (street number plus phone, see contact_numbers) and the emergency/urgent care flags
+HOSPITAL_RANDOM_VALUES = 12
+
+def get_hospital_locations(location, injury_type='general', radius=25):
+    """Generate hospital locations for a given area"""
+    base_coords = geocode_location(location)
+    hospitals = []
     
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+    # Draw every hospital's random values in one batch up front
+    draw = random.random
+    count = 5 + int(draw() * 4)  # 5-8 hospitals
+    random_block = [[draw() for _ in range(HOSPITAL_RANDOM_VALUES)] for _ in range(count)]
     
-    def get_hospital_locations(self, location, injury_type='general', radius=25):
-        """Generate hospital locations for a given area"""
-        base_coords = self.geocode_location(location)
-        hospitals = []
-        
-        # Hospital name templates
-        hospital_types = [
-            "General Hospital", "Medical Center", "Regional Medical Center", 
-            "Community Hospital", "Memorial Hospital", "St. Mary's Hospital",
-            "University Medical Center", "Emergency Medical Center"
-        ]
-        
-        specialties = [
-            ["Emergency Medicine", "Internal Medicine", "Surgery"],
-            ["Cardiology", "Emergency Medicine", "Orthopedics"],
-            ["Pediatrics", "Emergency Medicine", "Family Medicine"],
-            ["Trauma Care", "Emergency Medicine", "Critical Care"],
-            ["Orthopedics", "Sports Medicine", "Physical Therapy"],
-            ["Urgent Care", "Family Medicine", "Internal Medicine"]
-        ]
-        
-        # Generate 5-8 hospitals
-        for i in range(random.randint(5, 8)):
-            # Add some location variance
-            lat_offset = random.uniform(-0.1, 0.1)
-            lng_offset = random.uniform(-0.1, 0.1)
-            
-            hospital = {
-                "name": f"{random.choice(['Central', 'West', 'East', 'North', 'South'])} {random.choice(hospital_types)}",
-                "distance": f"{round(random.uniform(0.5, radius), 1)} miles",
-                "rating": f"{round(random.uniform(3.5, 5.0), 1)}/5",
-                "specialties": random.choice(specialties),
-                "wait_time": f"{random.randint(15, 120)}-{random.randint(120, 180)} min",
-                "lat": base_coords["lat"] + lat_offset,
-                "lng": base_coords["lng"] + lng_offset,
-                "address": f"{random.randint(100, 9999)} Medical Drive, {location}",
-                "phone": f"({random.randint(200, 999)}) {random.randint(200, 999)}-{random.randint(1000, 9999)}",
-                "emergency": random.choice([True, False]),
-                "urgentCare": random.choice([True, False])
-            }
-            hospitals.append(hospital)
-        
-        # Sort by distance (approximate)
-        hospitals.sort(key=lambda x: float(x["distance"].split()[0]))
-        
-        return hospitals
+    # The location is fixed per request, so only the street number varies per hospital
+    address_suffix = f" Medical Drive, {location}"
     
-    def geocode_location(self, location):
-        """Simple geocoding for demo purposes"""
-        location_coords = {
-            "los angeles, ca": {"lat": 34.0522, "lng": -118.2437},
-            "new york, ny": {"lat": 40.7128, "lng": -74.0060},
-            "chicago, il": {"lat": 41.8781, "lng": -87.6298},
-            "houston, tx": {"lat": 29.7604, "lng": -95.3698},
-            "phoenix, az": {"lat": 33.4484, "lng": -112.0740},
-        }
-        
-        location_lower = location.lower().strip()
+    for random_values in random_block:
+        (prefix_draw, type_draw, distance_draw, rating_draw, specialties_draw, wait_low_draw, wait_high_draw,
+         lat_draw, lng_draw, contact_draw, emergency_draw, urgent_draw) = random_values
+        street, area, exchange, line = contact_numbers(contact_draw)
         
-        # Check for exact or partial match
-        for key, coords in location_coords.items():
-            if any(part in location_lower for part in key.split(", ")):
-                return coords
+        # Add some location variance
+        lat_offset = (lat_draw - 0.5) * 0.2
+        lng_offset = (lng_draw - 0.5) * 0.2
+        distance_miles = round(0.5 + distance_draw * (radius - 0.5), 1)
         
-        # Default to Los Angeles
-        return {"lat": 34.0522, "lng": -118.2437} 
\ No newline at end of file
+        hospital = {
+            "name": f"{HOSPITAL_PREFIXES[int(prefix_draw * 5)]} {HOSPITAL_TYPES[int(type_draw * 8)]}",
+            "distance": f"{distance_miles} miles",
+            "rating": f"{round(3.5 + rating_draw * 1.5, 1)}/5",
+            "specialties": HOSPITAL_SPECIALTIES[int(specialties_draw * 6)],
+            "wait_time": f"{15 + int(wait_low_draw * 106)}-{120 + int(wait_high_draw * 61)} min",
+            "lat": base_coords["lat"] + lat_offset,
+            "lng": base_coords["lng"] + lng_offset,
+            "address": f"{street}{address_suffix}",
+            "phone": f"({area}) {exchange}-{line}",
+            "emergency": emergency_draw < 0.5,
+            "urgentCare": urgent_draw < 0.5
+        }
+        hospitals.append((distance_miles, hospital))
+    
+    # Sort by distance (approximate), keyed on the number rather than the formatted string
+    hospitals.sort(key=itemgetter(0))
+    
+    return [hospital for _, hospital in hospitals]
+
+# Demo locations in priority order; earlier entries win partial matches
+LOCATION_COORDS = {
+    "los angeles, ca": {"lat": 34.0522, "lng": -118.2437},
+    "new york, ny": {"lat": 40.7128, "lng": -74.0060},
+    "chicago, il": {"lat": 41.8781, "lng": -87.6298},
+    "houston, tx": {"lat": 29.7604, "lng": -95.3698},
+    "phoenix, az": {"lat": 33.4484, "lng": -112.0740},
+}
+
+LOCATION_COORDS_BY_RANK = tuple(LOCATION_COORDS.values())
+
+# Used when no city or state part appears in the location
+DEFAULT_COORDS = {"lat": 34.0522, "lng": -118.2437}
+
+# Earliest-listed location whose city or state part appears in a query
+best_location_rank = build_location_matcher(LOCATION_COORDS)
+
+@lru_cache(maxsize=1024)
+def geocode_location(location):
+    """Simple geocoding for demo purposes, cached per string (treat the result as read-only)"""
+    location_lower = location.lower().strip()
+    
+    # Check for exact or partial match; the earliest-listed location wins
+    best_rank = best_location_rank(location_lower)
+    if best_rank is not None:
+        return LOCATION_COORDS_BY_RANK[best_rank]
+    
+    # Default to Los Angeles
+    return DEFAULT_COORDS
@@ -1,100 +1,136 @@
-from http.server import BaseHTTPRequestHandler
-import json
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import FastAPI, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from api._shared import add_body_size_limit
+import logging
+import orjson
 import random
-import urllib.parse
-
-class handler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+import time
+
+logger = logging.getLogger(__name__)
+
+# Largest declared POST body accepted
+MAX_BODY_BYTES = 64 * 1024
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+add_body_size_limit(app, MAX_BODY_BYTES)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type"],
+    # Let browsers reuse a preflight answer for a day instead of re-asking per request
+    max_age=86400,
+)
+
+# Sent for any failure while building a reading; the details go to the log only
+WEATHER_ERROR_BODY = orjson.dumps({"error": "Weather data error"})
+
+# Seconds an encoded reading for a named location is reused
+LOCATION_WEATHER_TTL = 10
+
+# Named locations cached at once; the cache is simply emptied when it fills
+LOCATION_WEATHER_CACHE_SIZE = 512
+
+# Encoded readings for named locations: location -> (expires_at, body)
+location_weather_cache = {}
+
+class WeatherRequest(BaseModel):
+    location: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+
+@app.post("/api/weather/current")
+async def current_weather(request: Optional[WeatherRequest] = None):
+    try:
+        # An empty body is answered for an unknown location
+        if request is None:
+            request = WeatherRequest()
         
-        try:
-            # Read request body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode()) if content_length > 0 else {}
-            
-            # Extract location data
-            location = data.get('location')
-            lat = data.get('lat')
-            lon = data.get('lon')
-            
-            # Generate weather data
-            weather_data = self.get_weather_data(location, lat, lon)
-            
-            self.wfile.write(json.dumps(weather_data).encode())
-            
-        except Exception as e:
-            error_response = {"error": f"Weather data error: {str(e)}"}
-            self.wfile.write(json.dumps(error_response).encode())
+        # Generate weather data
+        if request.location:
+            return location_weather_response(request.location)
+        return get_weather_data(request.location, request.lat, request.lon)
     
-    def do_GET(self):
-        # Handle GET requests with query parameters
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        
-        # Parse query parameters
-        parsed_path = urllib.parse.urlparse(self.path)
-        query_params = urllib.parse.parse_qs(parsed_path.query)
-        
-        location = query_params.get('location', [None])[0]
-        lat = query_params.get('lat', [None])[0]
-        lon = query_params.get('lon', [None])[0]
-        
-        if lat:
-            lat = float(lat)
-        if lon:
-            lon = float(lon)
-        
-        weather_data = self.get_weather_data(location, lat, lon)
-        self.wfile.write(json.dumps(weather_data).encode())
+    except Exception:
+        logger.exception("Weather data error")
+        return Response(content=WEATHER_ERROR_BODY, status_code=500, media_type="application/json")
+
+@app.get("/api/weather/current")
+async def current_weather_query(location: Optional[str] = None, lat: Optional[float] = None, lon: Optional[float] = None):
+    # Handle GET requests with query parameters
+    if location:
+        return location_weather_response(location)
+    return get_weather_data(location, lat, lon)
+
+def location_weather_response(location):
+    """Serve the cached encoded reading for a named location, generating it on a miss"""
+    now = time.monotonic()
+    entry = location_weather_cache.get(location)
+    if entry is not None and entry[0] > now:
+        return Response(content=entry[1], media_type="application/json")
     
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+    if len(location_weather_cache) >= LOCATION_WEATHER_CACHE_SIZE:
+        location_weather_cache.clear()
+    body = orjson.dumps(get_weather_data(location))
+    location_weather_cache[location] = (now + LOCATION_WEATHER_TTL, body)
+    return Response(content=body, media_type="application/json")
+
+# Known cities for reverse geocoding, checked in order: (lat, lon, name)
+REVERSE_GEOCODE_CITIES = (
+    (34.0522, -118.2437, "Los Angeles, CA"),
+    (40.7128, -74.0060, "New York, NY"),
+    (41.8781, -87.6298, "Chicago, IL"),
+)
+
+# Simulated weather conditions
+WEATHER_CONDITIONS = ("Clear", "Partly Cloudy", "Cloudy", "Light Rain", "Sunny", "Overcast")
+
+# Random draws per simulated reading: temperature, description, humidity, wind
+# speed, UV index and condition
+WEATHER_RANDOM_VALUES = 6
+
+@lru_cache(maxsize=1024)
+def reverse_geocode(lat, lon):
+    """Name the first known city within a degree of the coordinates (simplified), cached per pair"""
+    return next(
+        (name for city_lat, city_lon, name in REVERSE_GEOCODE_CITIES if abs(lat - city_lat) < 1 and abs(lon - city_lon) < 1),
+        f"Location at {lat:.2f}, {lon:.2f}"
+    )
+
+def get_weather_data(location=None, lat=None, lon=None):
+    """Generate simulated weather data"""
+    # Determine location name
+    if location:
+        location_name = location
+    elif lat is not None and lon is not None:
+        # Reverse geocode coordinates to location name
+        location_name = reverse_geocode(lat, lon)
+    else:
+        location_name = "Unknown Location"
     
-    def get_weather_data(self, location=None, lat=None, lon=None):
-        """Generate simulated weather data"""
-        conditions = ["Clear", "Partly Cloudy", "Cloudy", "Light Rain", "Sunny", "Overcast"]
-        
-        # Determine location name
-        if location:
-            location_name = location
-        elif lat is not None and lon is not None:
-            # Reverse geocode coordinates to location name (simplified)
-            if abs(lat - 34.0522) < 1 and abs(lon - (-118.2437)) < 1:
-                location_name = "Los Angeles, CA"
-            elif abs(lat - 40.7128) < 1 and abs(lon - (-74.0060)) < 1:
-                location_name = "New York, NY"
-            elif abs(lat - 41.8781) < 1 and abs(lon - (-87.6298)) < 1:
-                location_name = "Chicago, IL"
-            else:
-                location_name = f"Location at {lat:.2f}, {lon:.2f}"
-        else:
-            location_name = "Unknown Location"
-        
-        # Generate weather data
-        temp_celsius = round(random.uniform(15, 35), 1)
-        temp_fahrenheit = round((temp_celsius * 9/5) + 32, 1)
-        
-        return {
-            "location": location_name,
-            "temperature": temp_fahrenheit,
-            "description": random.choice(conditions),
-            "humidity": random.randint(30, 80),
-            "windSpeed": round(random.uniform(5, 25), 1),
-            "uvIndex": random.randint(1, 11),
-            "icon": "01d",
-            "condition": random.choice(conditions)
-        } 
\ No newline at end of file
+    # Draw every simulated value in one batch and scale each to its range
+    draw = random.random
+    temp_draw, description_draw, humidity_draw, wind_draw, uv_draw, condition_draw = [draw() for _ in range(WEATHER_RANDOM_VALUES)]
+    
+    # Generate weather data
+    temp_celsius = round(15 + temp_draw * 20, 1)
+    temp_fahrenheit = round((temp_celsius * 9/5) + 32, 1)
+    
+    return {
+        "location": location_name,
+        "temperature": temp_fahrenheit,
+        "description": WEATHER_CONDITIONS[int(description_draw * len(WEATHER_CONDITIONS))],
+        "humidity": 30 + int(humidity_draw * 51),  # 30-80
+        "windSpeed": round(5 + wind_draw * 20, 1),
+        "uvIndex": 1 + int(uv_draw * 11),  # 1-11
+        "icon": "01d",
+        "condition": WEATHER_CONDITIONS[int(condition_draw * len(WEATHER_CONDITIONS))]
+    }